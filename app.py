@@ -9,54 +9,298 @@ Basé sur la librairie hydroqc de titilambert.
 """
 import os
 import logging
+import logging.handlers
+import queue
 import asyncio
-from typing import Optional, Dict, Any, List
-from datetime import datetime, timedelta
+import gzip
+import hashlib
+from typing import Optional, Dict, Any, List, Tuple, Union
+from datetime import date, datetime, timedelta
+from email.utils import formatdate, parsedate_to_datetime
 from contextlib import asynccontextmanager
+from dataclasses import dataclass, field, replace
+from operator import attrgetter
 
 from fastapi import FastAPI, HTTPException, status, Request
-from fastapi.responses import JSONResponse, PlainTextResponse, HTMLResponse
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse, PlainTextResponse, HTMLResponse, Response
+from pydantic import BaseModel, TypeAdapter
 from dotenv import load_dotenv
+import aiojobs
 import httpx
+import orjson
 
 from hydroqc.webuser import WebUser
 from hydroqc.customer import Customer
+from hydroqc.error import HydroQcHTTPError
 
 # Load environment variables / Chargement des variables d'environnement
 load_dotenv()
 
 # Configure logging / Configuration de la journalisation
+# Records are queued and written by a background thread so the event loop never blocks on I/O
+# Les entrées sont mises en file et écrites par un thread d'arrière-plan pour ne jamais bloquer la boucle
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+_log_queue: queue.Queue = queue.Queue(-1)
 logging.basicConfig(
-    level=logging.DEBUG,
+    level=LOG_LEVEL,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("hydroqc_debug.log"),
-        logging.StreamHandler()
-    ]
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
 )
+_log_listener = logging.handlers.QueueListener(
+    _log_queue,
+    logging.FileHandler("hydroqc_debug.log"),
+    logging.StreamHandler()
+)
+_log_listener.start()
 logger = logging.getLogger(__name__)
 
 # Configuration
 HYDRO_USERNAME = os.getenv("HYDRO_USERNAME")
 HYDRO_PASSWORD = os.getenv("HYDRO_PASSWORD")
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")
+WEBHOOK_TIMEOUT_SECONDS = 5
+WEBHOOK_CONCURRENCY = 4
 REFRESH_INTERVAL_SECONDS = 600  # 10 minutes
+STARTUP_REFRESH_TIMEOUT_SECONDS = 15
+# Peak status changes at peak start/end, so it is refreshed more often than the rest
+# Le statut de pointe change au début/à la fin des pointes, il est donc rafraîchi plus souvent que le reste
+PEAK_REFRESH_INTERVAL_SECONDS = int(os.getenv("PEAK_REFRESH_INTERVAL_SECONDS", "60"))
+CLOCK_INTERVAL_SECONDS = 0.5
+HTTP_CACHE_MAX_AGE_SECONDS = 30
+GZIP_MINIMUM_SIZE = 512
+
+# Current period fields: (response key, hydroqc attribute)
+# Champs de la période actuelle : (clé de réponse, attribut hydroqc)
+PERIOD_FIELDS = (
+    ("period_start", "period_start_date"),
+    ("period_end", "period_end_date"),
+    ("total_consumption", "total_consumption"),
+    ("lower_price_consumption", "lower_price_consumption"),
+    ("higher_price_consumption", "higher_price_consumption"),
+    ("total_days", "period_total_days"),
+    ("mean_daily_consumption", "period_mean_daily_consumption"),
+)
+_period_keys = tuple(key for key, _ in PERIOD_FIELDS)
+_period_values = attrgetter(*(attr for _, attr in PERIOD_FIELDS))
+_peak_dates = attrgetter('start_date', 'end_date')
 
 # Global client instance / Instance client globale
 _webuser_client: Optional[WebUser] = None
 
+# Peak event row / Ligne d'événement de pointe
+@dataclass(slots=True)
+class PeakEvent:
+    customer_id: str
+    account_id: str
+    contract_id: str
+    ispeak: bool
+    start: Optional[datetime]
+    end: Optional[datetime]
+    state: str
+
+
+# Response models, validated once and serialized by pydantic-core
+# Modèles de réponse, validés une fois et sérialisés par pydantic-core
+class ContractBalance(BaseModel):
+    contract_id: str
+    balance: Optional[float] = None
+
+
+class AccountView(BaseModel):
+    account_id: str
+    balance: Optional[float] = None
+    contracts: List[ContractBalance] = []
+
+
+class CustomerView(BaseModel):
+    customer_id: str
+    accounts: List[AccountView] = []
+
+
+class ConsumptionPeriod(BaseModel):
+    contract_id: str
+    period_start: Optional[Union[datetime, date]] = None
+    period_end: Optional[Union[datetime, date]] = None
+    total_consumption: Optional[float] = None
+    lower_price_consumption: Optional[float] = None
+    higher_price_consumption: Optional[float] = None
+    total_days: Optional[int] = None
+    mean_daily_consumption: Optional[float] = None
+
+
+class BalanceRow(BaseModel):
+    contract_id: str
+    balance: Optional[float] = None
+    account_id: str
+    customer_id: str
+
+
+PEAK_EVENT_ADAPTER = TypeAdapter(PeakEvent)
+PEAK_EVENTS_ADAPTER = TypeAdapter(List[PeakEvent])
+CUSTOMERS_ADAPTER = TypeAdapter(List[CustomerView])
+CONSUMPTION_ADAPTER = TypeAdapter(List[ConsumptionPeriod])
+BALANCES_ADAPTER = TypeAdapter(List[BalanceRow])
+
+
+# Peak events stored as parallel arrays, one index per contract
+# Événements de pointe stockés en tableaux parallèles, un indice par contrat
+@dataclass
+class PeakSnapshot:
+    customer_ids: List[str] = field(default_factory=list)
+    account_ids: List[str] = field(default_factory=list)
+    contract_ids: List[str] = field(default_factory=list)
+    is_peak: List[bool] = field(default_factory=list)
+    start_dates: List[Optional[datetime]] = field(default_factory=list)
+    end_dates: List[Optional[datetime]] = field(default_factory=list)
+    states: List[str] = field(default_factory=list)
+
+    def rows(self) -> List[PeakEvent]:
+        """
+        Zip the arrays into peak event rows
+        Combiner les tableaux en lignes d'événements de pointe
+        """
+        return list(map(
+            PeakEvent,
+            self.customer_ids, self.account_ids, self.contract_ids,
+            self.is_peak, self.start_dates, self.end_dates, self.states
+        ))
+
+
+# Pre-serialized response body / Corps de réponse pré-sérialisé
+class Payload:
+    def __init__(self, content: bytes = b"[]", updated: Optional[datetime] = None):
+        self.content = content
+        # HTTP validators computed once per refresh / Validateurs HTTP calculés une fois par rafraîchissement
+        digest = hashlib.blake2b(content, digest_size=8).hexdigest()
+        self.etag = f'"{digest}"'
+        self.modified = int(updated.timestamp()) if updated else None
+        self.last_modified = formatdate(self.modified, usegmt=True) if updated else None
+        # Compressed once per refresh, not per request / Compressé une fois par rafraîchissement, pas par requête
+        self.gzip_content = gzip.compress(content, compresslevel=6) if len(content) >= GZIP_MINIMUM_SIZE else None
+        # Each encoding is its own representation with its own validator
+        # Chaque encodage est une représentation distincte avec son propre validateur
+        self.gzip_etag = f'"{digest}-gzip"' if self.gzip_content is not None else None
+
+
 # Global Cache / Cache global
-class Cache:
-    def __init__(self):
-        self.peak_events = []
-        self.customers = []
-        self.consumption = []
-        self.balances = []
-        self.last_updated = None
-        self.initialized = False
+# (customer, account, contract, peak_handler) / (client, compte, contrat, gestionnaire de pointe)
+PeakContract = Tuple[Customer, Any, Any, Any]
+
+# Immutable, refreshes publish a new snapshot by rebinding _data_cache
+# Immuable, les rafraîchissements publient un nouvel instantané en réaffectant _data_cache
+@dataclass(slots=True, frozen=True)
+class CacheSnapshot:
+    peaks: PeakSnapshot = field(default_factory=PeakSnapshot)
+    # Serialized once per refresh, served as-is / Sérialisés une fois par rafraîchissement, servis tels quels
+    peak_events: Payload = field(default_factory=Payload)
+    customers: Payload = field(default_factory=Payload)
+    consumption: Payload = field(default_factory=Payload)
+    balances: Payload = field(default_factory=Payload)
+    peak_contracts: Tuple[PeakContract, ...] = ()
+    last_updated: Optional[datetime] = None
+    peaks_updated: Optional[datetime] = None
+
+    @property
+    def initialized(self) -> bool:
+        return self.last_updated is not None
+
+_data_cache = CacheSnapshot()
+# Background jobs scheduler / Planificateur des tâches d'arrière-plan
+_scheduler: Optional[aiojobs.Scheduler] = None
+
+# Cached clock shared by responses / Horloge en cache partagée par les réponses
+_clock_now: datetime = datetime.now()
+_clock_iso: bytes = _clock_now.isoformat().encode()
+
+# Serializes re-logins between the refresh loops / Sérialise les reconnexions entre les boucles de rafraîchissement
+_login_lock = asyncio.Lock()
+_peaks_lock = asyncio.Lock()
+# Set once a refresh attempt has completed / Défini dès qu'une tentative de rafraîchissement est terminée
+_refresh_attempted = asyncio.Event()
+
+_webhook_semaphore = asyncio.Semaphore(WEBHOOK_CONCURRENCY)
+
+
+def accepts_gzip(request: Request) -> bool:
+    """
+    Check whether Accept-Encoding allows gzip, honouring q=0
+    Vérifier si Accept-Encoding autorise gzip, en respectant q=0
+    """
+    for coding in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() != "gzip":
+            continue
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+def is_not_modified(request: Request, etag: str, modified: Optional[int]) -> bool:
+    """
+    Check the request's If-None-Match / If-Modified-Since against the served representation
+    Vérifier If-None-Match / If-Modified-Since de la requête par rapport à la représentation servie
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # "*" or a comma-separated list, weak comparison / "*" ou une liste séparée par des virgules, comparaison faible
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*" or tag.removeprefix("W/") == etag:
+                return True
+        return False
+    
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or modified is None:
+        return False
+    try:
+        return parsedate_to_datetime(if_modified_since).timestamp() >= modified
+    except (TypeError, ValueError):
+        return False
 
-_data_cache = Cache()
-_background_task: Optional[asyncio.Task] = None
+
+def payload_response(request: Request, payload: Payload) -> Response:
+    """
+    Serve a pre-serialized payload, answering 304 Not Modified when the client already has it
+    Servir un contenu pré-sérialisé, en répondant 304 Not Modified si le client l'a déjà
+    """
+    # Pick the representation first so the 304 carries its validator
+    # Choisir la représentation d'abord pour que le 304 porte son validateur
+    use_gzip = payload.gzip_content is not None and accepts_gzip(request)
+    etag = payload.gzip_etag if use_gzip else payload.etag
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"max-age={HTTP_CACHE_MAX_AGE_SECONDS}",
+        "Vary": "Accept-Encoding"
+    }
+    if payload.last_modified:
+        headers["Last-Modified"] = payload.last_modified
+    
+    if is_not_modified(request, etag, payload.modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=payload.gzip_content, media_type="application/json", headers=headers)
+    
+    return Response(content=payload.content, media_type="application/json", headers=headers)
+
+
+def _is_login_rejected(error: HydroQcHTTPError) -> bool:
+    """
+    Tell a credential rejection apart from other hydroqc HTTP errors
+    hydroqc raises HydroQcHTTPError for any unexpected status ("Error Fetching <url> - <status>")
+
+    Distinguer un refus des identifiants des autres erreurs HTTP de hydroqc
+    hydroqc lève HydroQcHTTPError pour tout statut inattendu ("Error Fetching <url> - <status>")
+    """
+    message = str(error).strip().lower()
+    return "credential" in message or message.endswith(("- 401", "- 403"))
 
 
 async def get_webuser() -> WebUser:
@@ -74,198 +318,305 @@ async def get_webuser() -> WebUser:
         )
     
     if _webuser_client is None:
-        try:
-            logger.info(f"🔐 Attempting login for user: {HYDRO_USERNAME}")
-            _webuser_client = WebUser(
-                HYDRO_USERNAME, 
-                HYDRO_PASSWORD, 
-                verify_ssl=True,
-                log_level="DEBUG"
+        _webuser_client = WebUser(
+            HYDRO_USERNAME, 
+            HYDRO_PASSWORD, 
+            verify_ssl=True,
+            log_level=LOG_LEVEL
+        )
+    
+    # Re-login in place so the client keeps its HTTP session and connection pool
+    # Se reconnecter sur place pour que le client conserve sa session HTTP et son pool de connexions
+    if _webuser_client.session_expired:
+        async with _login_lock:
+            # Another loop may have logged in while we waited / Une autre boucle a pu se connecter pendant l'attente
+            if _webuser_client.session_expired:
+                try:
+                    logger.info("🔐 Attempting login for user: %s", HYDRO_USERNAME)
+                    await _webuser_client.login()
+                    logger.info("✅ Login successful / Connexion réussie")
+                    
+                except HydroQcHTTPError as e:
+                    if not _is_login_rejected(e):
+                        # Any other HTTP status is an upstream failure / Tout autre statut HTTP est une panne distante
+                        logger.error("❌ Login unavailable: %s", e)
+                        raise HTTPException(
+                            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail=f"Hydro-Quebec unavailable: {str(e)}"
+                        )
+                    # Rejected by Hydro-Quebec / Refusé par Hydro-Québec
+                    logger.error("❌ Login failed: %s", e)
+                    raise HTTPException(
+                        status_code=status.HTTP_401_UNAUTHORIZED,
+                        detail=f"Authentication failed: {str(e)}"
+                    )
+                except Exception as e:
+                    # Upstream unreachable, keep the client for the next attempt
+                    # Service distant injoignable, conserver le client pour la prochaine tentative
+                    logger.error("❌ Login unavailable: %s", e, exc_info=True)
+                    raise HTTPException(
+                        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                        detail=f"Hydro-Quebec unavailable: {str(e)}"
+                    )
+    
+    return _webuser_client
+
+
+async def fetch_customers(webuser: WebUser) -> List[Customer]:
+    """
+    Fetch customers info and each customer's accounts
+    Récupérer les informations clients et les comptes de chaque client
+    """
+    # CRITICAL: Must call get_info() to populate customers list
+    # CRITIQUE : Doit appeler get_info() pour remplir la liste des clients
+    await webuser.get_info()
+    logger.info("📋 Found %d customer(s) / Trouvé %d client(s)", len(webuser.customers), len(webuser.customers))
+    
+    # Fetch additional info for each customer concurrently
+    # Récupérer des informations supplémentaires pour chaque client en parallèle
+    await asyncio.gather(*(customer.get_info() for customer in webuser.customers))
+    for customer in webuser.customers:
+        logger.info("👤 Customer %s: %d account(s)", customer.customer_id, len(customer.accounts))
+    
+    return webuser.customers
+
+
+def _period_data(contract, period) -> ConsumptionPeriod:
+    """
+    Build the consumption row for a contract's current period
+    Construire la ligne de consommation de la période actuelle d'un contrat
+    """
+    return ConsumptionPeriod(
+        contract_id=contract.contract_id,
+        **dict(zip(_period_keys, _period_values(period)))
+    )
+
+
+# Result of one traversal of the customer tree / Résultat d'un parcours de l'arbre des clients
+@dataclass(slots=True, frozen=True)
+class CustomerTree:
+    customers: List[CustomerView]
+    consumption: List[ConsumptionPeriod]
+    balances: List[BalanceRow]
+    peak_contracts: Tuple[PeakContract, ...]
+
+
+def _build_tree(customers: List[Customer]) -> CustomerTree:
+    """
+    Build every cached row from already-fetched customers, without I/O
+    Construire toutes les lignes du cache à partir des clients déjà récupérés, sans E/S
+    """
+    peak_contracts: List[PeakContract] = []
+    customers_data: List[CustomerView] = []
+    consumption_data: List[ConsumptionPeriod] = []
+    balances_data: List[BalanceRow] = []
+    
+    # Single traversal feeding every payload / Parcours unique alimentant toutes les réponses
+    for customer in customers:
+        accounts = getattr(customer, 'accounts', ()) or ()
+        if not accounts:
+            continue
+        
+        # Customers / Clients
+        customer_data = CustomerView(customer_id=customer.customer_id)
+        customers_data.append(customer_data)
+        
+        for account in accounts:
+            account_data = AccountView(
+                account_id=account.account_id,
+                balance=getattr(account, 'balance', None)
             )
-            await _webuser_client.login()
-            logger.info("✅ Login successful / Connexion réussie")
+            customer_data.accounts.append(account_data)
             
-        except Exception as e:
-            logger.error(f"❌ Login failed: {str(e)}", exc_info=True)
-            _webuser_client = None
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail=f"Authentication failed: {str(e)}"
+            for contract in getattr(account, 'contracts', ()) or ():
+                balance = getattr(contract, 'balance', None)
+                account_data.contracts.append(ContractBalance(
+                    contract_id=contract.contract_id,
+                    balance=balance
+                ))
+                
+                # Balance / Solde
+                balances_data.append(BalanceRow(
+                    contract_id=contract.contract_id,
+                    balance=balance,
+                    account_id=account.account_id,
+                    customer_id=customer.customer_id
+                ))
+                
+                # Consumption / Consommation
+                period = getattr(contract, 'current_period', None)
+                if period:
+                    consumption_data.append(_period_data(contract, period))
+                
+                # Peak handler (Winter Credit / Rate D CPC) / Gestionnaire de pointe (Crédit hivernal / Tarif D CPC)
+                handler = getattr(contract, 'peak_handler', None)
+                if handler:
+                    peak_contracts.append((customer, account, contract, handler))
+
+    return CustomerTree(
+        customers=customers_data,
+        consumption=consumption_data,
+        balances=balances_data,
+        peak_contracts=tuple(peak_contracts)
+    )
+
+
+async def send_webhook(event: PeakEvent):
+    """
+    POST a peak event to WEBHOOK_URL, bounded by WEBHOOK_CONCURRENCY
+    Envoyer un événement de pointe à WEBHOOK_URL, limité par WEBHOOK_CONCURRENCY
+    """
+    async with _webhook_semaphore:
+        try:
+            # Same encoder as /api/peak-events / Même encodeur que /api/peak-events
+            response = await app.state.webhook_client.post(
+                WEBHOOK_URL,
+                content=PEAK_EVENT_ADAPTER.dump_json(event),
+                headers={"Content-Type": "application/json"}
             )
+            response.raise_for_status()
+            logger.info("📣 Webhook sent for contract %s / Webhook envoyé pour le contrat %s", event.contract_id, event.contract_id)
+        except httpx.HTTPError as e:
+            logger.error("❌ Webhook failed for contract %s: %s", event.contract_id, e)
+
+
+async def dispatch_peak_changes(previous: PeakSnapshot, current: PeakSnapshot):
+    """
+    Fire a webhook for every contract whose ispeak or state changed
+    Déclencher un webhook pour chaque contrat dont ispeak ou l'état a changé
+    """
+    if not WEBHOOK_URL:
+        return
     
-    return _webuser_client
+    before = {
+        contract_id: (is_peak, state)
+        for contract_id, is_peak, state in zip(previous.contract_ids, previous.is_peak, previous.states)
+    }
+    for event in current.rows():
+        prior = before.get(event.contract_id)
+        # Contracts seen for the first time have no transition / Les nouveaux contrats n'ont pas de transition
+        if prior is None or prior == (event.ispeak, event.state):
+            continue
+        
+        await _scheduler.spawn(send_webhook(event))
 
 
-async def refresh_cache():
+async def refresh_peak_events():
     """
-    Fetch all data from Hydro-Quebec and update the global cache
-    Récupérer toutes les données d'Hydro-Québec et mettre à jour le cache global
+    Refresh peak handlers concurrently and rebuild the cached peak snapshot
+    Runs more often than the full refresh since peak status changes quickly
+
+    Rafraîchir les gestionnaires de pointe en parallèle et reconstruire l'instantané en cache
+    S'exécute plus souvent que le rafraîchissement complet car le statut de pointe change rapidement
     """
     global _data_cache
-    logger.info("🔄 Starting cache refresh... / Démarrage du rafraîchissement du cache...")
     
+    # Re-login first if the session expired, handlers share the WebUser session
+    # Se reconnecter d'abord si la session a expiré, les gestionnaires partagent la session WebUser
     try:
-        webuser = await get_webuser()
-        
-        # CRITICAL: Must call get_info() to populate customers list
-        # CRITIQUE : Doit appeler get_info() pour remplir la liste des clients
-        await webuser.get_info()
-        logger.info(f"📋 Found {len(webuser.customers)} customer(s) / Trouvé {len(webuser.customers)} client(s)")
-        
-        # Fetch additional info for each customer
-        # Récupérer des informations supplémentaires pour chaque client
-        for customer in webuser.customers:
-            await customer.get_info()
-            logger.info(f"👤 Customer {customer.customer_id}: {len(customer.accounts)} account(s)")
-
-        # 1. Process Peak Events / Traiter les événements de pointe
-        peak_events_data = []
-        for customer in webuser.customers:
-            if not hasattr(customer, 'accounts') or not customer.accounts:
-                continue
+        await get_webuser()
+    except HTTPException as e:
+        logger.warning("⚠️ Skipping peak refresh / Rafraîchissement des pointes ignoré: %s", e.detail)
+        return
+    
+    try:
+        async with _peaks_lock:
+            peak_contracts = _data_cache.peak_contracts
+            
+            # Refresh peak handlers data concurrently, one failure doesn't cancel the others
+            # Rafraîchir les données des gestionnaires de pointe en parallèle, un échec n'annule pas les autres
+            results = await asyncio.gather(
+                *(handler.refresh_data() for _, _, _, handler in peak_contracts),
+                return_exceptions=True
+            )
+            for (_, _, contract, _), result in zip(peak_contracts, results):
+                if isinstance(result, BaseException):
+                    logger.error("❌ Failed to refresh handler data for contract %s: %s", contract.contract_id, result)
             
-            for account in customer.accounts:
-                if not hasattr(account, 'contracts') or not account.contracts:
-                    continue
+            peaks = PeakSnapshot()
+            for customer, account, contract, handler in peak_contracts:
+                start_date = None
+                end_date = None
                 
-                for contract in account.contracts:
-                    # Check if contract has peak handler (Winter Credit / Rate D CPC)
-                    # Vérifier si le contrat a un gestionnaire de pointe (Crédit hivernal / Tarif D CPC)
-                    if not hasattr(contract, 'peak_handler') or not contract.peak_handler:
-                        continue
-                    
-                    handler = contract.peak_handler
-                    
-                    # Refresh peak handler data / Rafraîchir les données du gestionnaire de pointe
-                    try:
-                        await handler.refresh_data()
-                    except Exception as e:
-                        logger.error(f"❌ Failed to refresh handler data: {e}")
-                    
+                # hydroqc properties may raise when handler data is incomplete
+                # Les propriétés hydroqc peuvent lever une exception si les données sont incomplètes
+                try:
                     # Determine status / Déterminer le statut
-                    is_peak = False
-                    try:
-                        is_peak = getattr(handler, 'current_peak_is_critical', None)
-                        if is_peak is None:
-                            is_peak = False
-                    except Exception as e:
-                        is_peak = False
+                    is_peak = bool(handler.current_peak_is_critical)
+                    current_state = handler.current_state
                     
+                    # Get current_peak if available / Obtenir le pic actuel si disponible
+                    current_peak = handler.current_peak
+                    peak = current_peak if is_peak and current_peak else handler.next_critical_peak
+                    if peak:
+                        start_date, end_date = _peak_dates(peak)
+                except Exception as e:
+                    # Keep the defaults for this contract only / Conserver les valeurs par défaut pour ce contrat seulement
+                    logger.error("❌ Failed to read peak data for contract %s: %s", contract.contract_id, e)
+                    is_peak = False
+                    current_state = "unknown"
                     start_date = None
                     end_date = None
-                    current_state = "unknown"
-                    
-                    try:
-                        current_state = getattr(handler, 'current_state', 'unknown')
-                    except Exception as e:
-                        pass
-                    
-                    # Get current_peak if available / Obtenir le pic actuel si disponible
-                    try:
-                        current_peak = getattr(handler, 'current_peak', None)
-                        next_critical = getattr(handler, 'next_critical_peak', None)
-                        
-                        if is_peak and current_peak:
-                            start_date = getattr(current_peak, 'start_date', None)
-                            end_date = getattr(current_peak, 'end_date', None)
-                        elif next_critical:
-                            start_date = getattr(next_critical, 'start_date', None)
-                            end_date = getattr(next_critical, 'end_date', None)
-                    except Exception as e:
-                        pass
-                    
-                    peak_events_data.append({
-                        "customer_id": customer.customer_id,
-                        "account_id": account.account_id,
-                        "contract_id": contract.contract_id,
-                        "ispeak": is_peak,
-                        "start": start_date.isoformat() if start_date else None,
-                        "end": end_date.isoformat() if end_date else None,
-                        "state": current_state
-                    })
-
-        # 2. Process Customers / Traiter les clients
-        customers_data = []
-        for customer in webuser.customers:
-            if not hasattr(customer, 'accounts') or not customer.accounts:
-                continue
                 
-            customer_data = {
-                "customer_id": customer.customer_id,
-                "accounts": []
-            }
+                peaks.customer_ids.append(customer.customer_id)
+                peaks.account_ids.append(account.account_id)
+                peaks.contract_ids.append(contract.contract_id)
+                peaks.is_peak.append(is_peak)
+                peaks.start_dates.append(start_date)
+                peaks.end_dates.append(end_date)
+                peaks.states.append(current_state)
             
-            for account in customer.accounts:
-                account_data = {
-                    "account_id": account.account_id,
-                    "balance": getattr(account, 'balance', None),
-                    "contracts": [
-                        {
-                            "contract_id": contract.contract_id,
-                            "balance": getattr(contract, 'balance', None),
-                        }
-                        for contract in getattr(account, 'contracts', [])
-                    ]
-                }
-                customer_data["accounts"].append(account_data)
+            await dispatch_peak_changes(_data_cache.peaks, peaks)
             
-            customers_data.append(customer_data)
+            # Publish the new snapshot in one assignment / Publier le nouvel instantané en une affectation
+            peaks_updated = datetime.now()
+            _data_cache = replace(
+                _data_cache,
+                peaks=peaks,
+                peak_events=Payload(PEAK_EVENTS_ADAPTER.dump_json(peaks.rows()), peaks_updated),
+                peaks_updated=peaks_updated
+            )
+        
+    except Exception as e:
+        logger.error("❌ Error refreshing peak events / Erreur lors du rafraîchissement des événements de pointe: %s", e, exc_info=True)
 
-        # 3. Process Consumption / Traiter la consommation
-        consumption_data = []
-        for customer in webuser.customers:
-            if not hasattr(customer, 'accounts') or not customer.accounts:
-                continue
-                
-            for account in customer.accounts:
-                if not hasattr(account, 'contracts') or not account.contracts:
-                    continue
-                    
-                for contract in account.contracts:
-                    if hasattr(contract, 'current_period') and contract.current_period:
-                        period = contract.current_period
-                        consumption_data.append({
-                            "contract_id": contract.contract_id,
-                            "period_start": getattr(period, 'period_start_date', None),
-                            "period_end": getattr(period, 'period_end_date', None),
-                            "total_consumption": getattr(period, 'total_consumption', None),
-                            "lower_price_consumption": getattr(period, 'lower_price_consumption', None),
-                            "higher_price_consumption": getattr(period, 'higher_price_consumption', None),
-                            "total_days": getattr(period, 'period_total_days', None),
-                            "mean_daily_consumption": getattr(period, 'period_mean_daily_consumption', None),
-                        })
-
-        # 4. Process Balance / Traiter le solde
-        balances_data = []
-        for customer in webuser.customers:
-            if not hasattr(customer, 'accounts') or not customer.accounts:
-                continue
-                
-            for account in customer.accounts:
-                if not hasattr(account, 'contracts') or not account.contracts:
-                    continue
-                    
-                for contract in account.contracts:
-                    balances_data.append({
-                        "contract_id": contract.contract_id,
-                        "balance": getattr(contract, 'balance', None),
-                        "account_id": account.account_id,
-                        "customer_id": customer.customer_id
-                    })
+
+async def refresh_cache():
+    """
+    Fetch all data from Hydro-Quebec and update the global cache
+    Récupérer toutes les données d'Hydro-Québec et mettre à jour le cache global
+    """
+    global _data_cache
+    logger.info("🔄 Starting cache refresh... / Démarrage du rafraîchissement du cache...")
+    
+    try:
+        webuser = await get_webuser()
+        customers = await fetch_customers(webuser)
+
+        tree = _build_tree(customers)
+        
+        # Peak events are rebuilt on their own cadence / Les événements de pointe sont reconstruits à leur propre rythme
+        _data_cache = replace(_data_cache, peak_contracts=tree.peak_contracts)
+        await refresh_peak_events()
 
         # Update Cache / Mettre à jour le cache
-        _data_cache.peak_events = peak_events_data
-        _data_cache.customers = customers_data
-        _data_cache.consumption = consumption_data
-        _data_cache.balances = balances_data
-        _data_cache.last_updated = datetime.now()
-        _data_cache.initialized = True
+        updated = datetime.now()
+        _data_cache = replace(
+            _data_cache,
+            customers=Payload(CUSTOMERS_ADAPTER.dump_json(tree.customers), updated),
+            consumption=Payload(CONSUMPTION_ADAPTER.dump_json(tree.consumption), updated),
+            balances=Payload(BALANCES_ADAPTER.dump_json(tree.balances), updated),
+            last_updated=updated
+        )
         
-        logger.info(f"✅ Cache refreshed at / Cache rafraîchi à {_data_cache.last_updated}")
+        logger.info("✅ Cache refreshed at / Cache rafraîchi à %s", _data_cache.last_updated)
         
     except Exception as e:
-        logger.error(f"❌ Error refreshing cache / Erreur lors du rafraîchissement du cache: {str(e)}", exc_info=True)
+        logger.error("❌ Error refreshing cache / Erreur lors du rafraîchissement du cache: %s", e, exc_info=True)
         # We don't raise here to keep the background task running
+    
+    finally:
+        _refresh_attempted.set()
 
 
 async def background_refresh_task():
@@ -278,6 +629,39 @@ async def background_refresh_task():
         await asyncio.sleep(REFRESH_INTERVAL_SECONDS)
 
 
+async def peak_refresh_task():
+    """
+    Periodic background task to refresh peak events between full refreshes
+    Tâche d'arrière-plan périodique pour rafraîchir les événements de pointe entre les rafraîchissements complets
+    """
+    while True:
+        await asyncio.sleep(PEAK_REFRESH_INTERVAL_SECONDS)
+        await refresh_peak_events()
+
+
+def tick_clock():
+    """
+    Update the cached clock
+    Mettre à jour l'horloge en cache
+    """
+    global _clock_now, _clock_iso
+    _clock_now = datetime.now()
+    _clock_iso = _clock_now.isoformat().encode()
+
+
+async def clock_task():
+    """
+    Periodic background task to update the cached clock, so responses
+    don't each format their own timestamp
+
+    Tâche d'arrière-plan périodique pour mettre à jour l'horloge en cache,
+    afin que les réponses ne formatent pas chacune leur propre horodatage
+    """
+    while True:
+        tick_clock()
+        await asyncio.sleep(CLOCK_INTERVAL_SECONDS)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
@@ -287,24 +671,41 @@ async def lifespan(app: FastAPI):
     # Startup / Démarrage
     logger.info("🚀 Starting Hydro-Quebec API Wrapper / Démarrage du Wrapper API Hydro-Québec")
     
-    # Start background task / Démarrer la tâche d'arrière-plan
-    global _background_task
-    _background_task = asyncio.create_task(background_refresh_task())
+    # Webhook HTTP client, one connection per concurrent webhook / Client HTTP des webhooks, une connexion par webhook concurrent
+    app.state.webhook_client = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=WEBHOOK_CONCURRENCY),
+        timeout=WEBHOOK_TIMEOUT_SECONDS
+    ) if WEBHOOK_URL else None
+    
+    # Start background tasks / Démarrer les tâches d'arrière-plan
+    global _scheduler
+    _scheduler = aiojobs.Scheduler()
+    await _scheduler.spawn(clock_task())
+    await _scheduler.spawn(background_refresh_task())
+    await _scheduler.spawn(peak_refresh_task())
+    
+    # Wait for the first refresh so early requests aren't served an empty cache
+    # Attendre le premier rafraîchissement pour ne pas servir un cache vide aux premières requêtes
+    try:
+        await asyncio.wait_for(_refresh_attempted.wait(), timeout=STARTUP_REFRESH_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        logger.warning("⚠️ Initial refresh still running, starting anyway / Rafraîchissement initial toujours en cours, démarrage quand même")
     
     yield
     
     # Shutdown / Arrêt
     logger.info("🛑 Shutting down Hydro-Quebec API Wrapper / Arrêt du Wrapper API Hydro-Québec")
-    if _background_task:
-        _background_task.cancel()
-        try:
-            await _background_task
-        except asyncio.CancelledError:
-            pass
-            
+    # Cancels the refresh loops and pending webhooks / Annule les boucles de rafraîchissement et les webhooks en attente
+    await _scheduler.close()
+    
     global _webuser_client
     if _webuser_client:
         await _webuser_client.close_session()
+    
+    if app.state.webhook_client:
+        await app.state.webhook_client.aclose()
+    
+    _log_listener.stop()
 
 
 # Create FastAPI app / Créer l'application FastAPI
@@ -312,9 +713,19 @@ app = FastAPI(
     title="Hydro-Quebec API Wrapper",
     description="General purpose REST API wrapper for Hydro-Quebec data / Wrapper API REST à usage général pour les données d'Hydro-Québec",
     version="1.1.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
+# Static part of the health check, serialized once without its closing brace
+# Partie statique de la vérification d'état, sérialisée une seule fois sans son accolade fermante
+_ROOT_PREFIX = orjson.dumps({
+    "status": "running",
+    "service": "Hydro-Quebec API Wrapper",
+    "version": app.version,
+    "configured": bool(HYDRO_USERNAME and HYDRO_PASSWORD),
+})[:-1]
+
 
 @app.get("/")
 async def root():
@@ -322,29 +733,29 @@ async def root():
     Health check endpoint
     Endpoint de vérification de l'état
     """
-    return {
-        "status": "running",
-        "service": "Hydro-Quebec API Wrapper",
-        "version": "1.1.0",
-        "timestamp": datetime.now().isoformat(),
-        "configured": bool(HYDRO_USERNAME and HYDRO_PASSWORD),
-        "cache_initialized": _data_cache.initialized,
-        "last_updated": _data_cache.last_updated.isoformat() if _data_cache.last_updated else None
-    }
+    cache = _data_cache
+    
+    # Splice the dynamic fields after the static prefix
+    # Ajouter les champs dynamiques après le préfixe statique
+    content = b"".join((
+        _ROOT_PREFIX,
+        b',"timestamp":"', _clock_iso,
+        b'","cache_initialized":', b"true" if cache.initialized else b"false",
+        b',"last_updated":', orjson.dumps(cache.last_updated),
+        b',"peaks_updated":', orjson.dumps(cache.peaks_updated),
+        b"}"
+    ))
+    return Response(content=content, media_type="application/json")
 
 
 @app.get("/api/peak-events")
-async def get_peak_events():
+async def get_peak_events(request: Request):
     """
     Get peak events information from cache
     Obtenir les informations sur les événements de pointe depuis le cache
     """
-    if not _data_cache.initialized:
-        # If cache not ready, try to wait a bit or return empty/error
-        # Si le cache n'est pas prêt, essayez d'attendre un peu ou retournez vide/erreur
-        logger.warning("⚠️ Cache not yet initialized, returning empty peak events / Cache pas encore initialisé, retour d'événements de pointe vides")
-    
-    return _data_cache.peak_events
+    # Empty until the cache is initialized / Vide tant que le cache n'est pas initialisé
+    return payload_response(request, _data_cache.peak_events)
 
 
 @app.get("/api/control4/peak-status")
@@ -357,60 +768,59 @@ async def get_control4_peak_status():
     Obtenir le statut simplifié des événements de pointe pour l'intégration Control4
     Retourne uniquement les données d'événement de pointe sans les IDs client/compte/contrat
     """
-    if not _data_cache.initialized:
-        logger.warning("⚠️ Cache not yet initialized / Cache pas encore initialisé")
-        return {
+    cache = _data_cache
+    if not cache.initialized:
+        return ORJSONResponse(content={
             "ispeak": False,
             "start": "",
             "end": "",
             "state": "unknown"
-        }
+        })
     
     # Return the first peak event if available, otherwise return default values
     # Retourner le premier événement de pointe si disponible, sinon retourner les valeurs par défaut
-    if _data_cache.peak_events and len(_data_cache.peak_events) > 0:
-        first_event = _data_cache.peak_events[0]
+    peaks = cache.peaks
+    if peaks.contract_ids:
         # Convert None to empty string for Control4 compatibility
-        start_val = first_event.get("start")
-        end_val = first_event.get("end")
+        start_val = peaks.start_dates[0]
+        end_val = peaks.end_dates[0]
         
         # Calculate minutes
         minutes_until_start = None
         minutes_to_end = None
-        now = datetime.now()
+        now = _clock_now
         
         if start_val:
             try:
-                start_dt = datetime.fromisoformat(start_val)
-                minutes_until_start = int((start_dt - now).total_seconds() / 60)
-            except (ValueError, TypeError):
+                minutes_until_start = int((start_val - now).total_seconds() / 60)
+            except TypeError:
                 pass
                 
         if end_val:
             try:
-                end_dt = datetime.fromisoformat(end_val)
-                minutes_to_end = int((end_dt - now).total_seconds() / 60)
-            except (ValueError, TypeError):
+                minutes_to_end = int((end_val - now).total_seconds() / 60)
+            except TypeError:
                 pass
         
-        return {
-            "ispeak": first_event.get("ispeak", False),
+        # Hottest endpoint: skip jsonable_encoder / Endpoint le plus sollicité : éviter jsonable_encoder
+        return ORJSONResponse(content={
+            "ispeak": peaks.is_peak[0],
             "start": start_val if start_val is not None else "",
             "end": end_val if end_val is not None else "",
             "minutes_until_start": minutes_until_start,
             "minutes_to_end": minutes_to_end,
-            "state": first_event.get("state", "unknown")
-        }
+            "state": peaks.states[0]
+        })
     
     # No peak events found / Aucun événement de pointe trouvé
-    return {
+    return ORJSONResponse(content={
         "ispeak": False,
         "start": "",
         "end": "",
         "minutes_until_start": None,
         "minutes_to_end": None,
         "state": "normal"
-    }
+    })
 
 
 # Test Data Configuration
@@ -428,7 +838,7 @@ async def get_control4_test():
     Dynamic test endpoint using configurable values.
     """
     # Calculate minutes
-    now = datetime.now()
+    now = _clock_now
     minutes_until_start = None
     minutes_to_end = None
     
@@ -540,32 +950,32 @@ async def test_interface():
 
 
 @app.get("/api/customers")
-async def get_customers():
+async def get_customers(request: Request):
     """
     Get all customer information from cache
     Obtenir toutes les informations client depuis le cache
     """
-    return _data_cache.customers
+    return payload_response(request, _data_cache.customers)
 
 
 @app.get("/api/consumption/current")
-async def get_current_consumption():
+async def get_current_consumption(request: Request):
     """
     Get current period consumption data from cache
     Obtenir les données de consommation de la période actuelle depuis le cache
     """
-    return _data_cache.consumption
+    return payload_response(request, _data_cache.consumption)
 
 
 @app.get("/api/balance")
-async def get_balance():
+async def get_balance(request: Request):
     """
     Get account balance from cache
     Obtenir le solde du compte depuis le cache
     """
-    return _data_cache.balances
+    return payload_response(request, _data_cache.balances)
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
+    uvicorn.run(app, host="0.0.0.0", port=8000)
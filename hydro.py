@@ -9,12 +9,8 @@ from hydroqc.webuser import WebUser
 USERNAME = os.getenv("hydroQcUsername")
 PASSWORD = os.getenv("hydroQcPassword")
 
-webuser = WebUser(
-    USERNAME, PASSWORD, verify_ssl=False, log_level="ERROR", http_log_level="ERROR"
-)
 
-
-async def async_func():
+async def async_func(webuser):
     await webuser.login()
     await webuser.get_info()
 
@@ -44,8 +40,7 @@ async def async_func():
     data = contract.peak_handler.cumulated_credit
     print(data)
 
-    # Need to call refresh_data before accessing attributes
-    await contract.peak_handler.refresh_data()
+    # Attributes below come from the refresh_data call above
     wc = contract.peak_handler.__dict__
     for k in wc.keys():
         if not k.startswith("value_"):
@@ -55,31 +50,32 @@ async def async_func():
     # Still accessible through the data property
     data = contract.peak_handler.raw_data
     print(data)
-    data = await contract.get_hourly_consumption(date.fromisoformat("2022-01-20"))
-    print(data)
-    data = await contract.get_today_hourly_consumption()
-    print(data)
-    data = await contract.get_today_daily_consumption()
-    print(data)
-    data = await contract.get_monthly_consumption()
-    print(data)
-    data = await contract.get_annual_consumption()
-    print(data)
-    data = await contract.get_daily_consumption(
-        date.fromisoformat("2022-01-10"), date.fromisoformat("2022-01-20")
+    # Independent requests, fetched concurrently
+    results = await asyncio.gather(
+        contract.get_hourly_consumption(date.fromisoformat("2022-01-20")),
+        contract.get_today_hourly_consumption(),
+        contract.get_today_daily_consumption(),
+        contract.get_monthly_consumption(),
+        contract.get_annual_consumption(),
+        contract.get_daily_consumption(
+            date.fromisoformat("2022-01-10"), date.fromisoformat("2022-01-20")
+        ),
     )
-    print(data)
+    for data in results:
+        print(data)
 
 
-loop = asyncio.get_event_loop()
+async def main():
+    webuser = WebUser(
+        USERNAME, PASSWORD, verify_ssl=False, log_level="ERROR", http_log_level="ERROR"
+    )
+    try:
+        await async_func(webuser)
+    except Exception as exp:
+        print(exp)
+    finally:
+        await webuser.close_session()
 
 
 # Fetch data
-try:
-    results = loop.run_until_complete(async_func())
-except BaseException as exp:
-    print(exp)
-finally:
-    close_fut = asyncio.wait([webuser.close_session()])
-    loop.run_until_complete(close_fut)
-    loop.close()
+asyncio.run(main())